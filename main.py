@@ -1,15 +1,129 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from collections import deque
 from datetime import datetime
+from itertools import islice
 import logging
+from typing import TYPE_CHECKING
 from src.helper import TextToSQLConverter
 from src.database import DatabaseManager
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows fetched for display unless the user asks for the full result set
+PREVIEW_ROWS = 500
+
+# Charts are downsampled above this many plotted points and switch to WebGL above WEBGL_ROWS rows
+MAX_CHART_POINTS = 50_000
+WEBGL_ROWS = 1_000
+
+# Query history entries kept per session, and how many of them are shown
+HISTORY_LIMIT = 50
+HISTORY_DISPLAY = 5
+
+# Largest result frame, in total cells, styled with a pandas background gradient
+MAX_STYLED_CELLS = 2_000
+
+# Injected on every run; Streamlit drops elements a rerun does not re-emit
+_APP_CSS = """
+<style>
+.stApp {
+    background: linear-gradient(135deg, #f5f7fa 0%, #f8f9fa 100%);
+}
+
+.main-header {
+    font-size: 3rem;
+    font-weight: 700;
+    text-align: center;
+    color: #1e293b;
+    margin-bottom: 1rem;
+    padding: 1rem 0;
+}
+
+.example-query-btn {
+    background-color: #ffffff;
+    border: 1px solid #e2e8f0;
+    border-radius: 8px;
+    padding: 0.75rem 1rem;
+    margin: 0.5rem 0;
+    text-align: left;
+    transition: all 0.2s ease;
+    cursor: pointer;
+    width: 100%;
+}
+
+.example-query-btn:hover {
+    background-color: #f8fafc;
+    border-color: #94a3b8;
+    transform: translateY(-2px);
+}
+
+.query-area {
+    background: white;
+    border: 1px solid #e2e8f0;
+    border-radius: 10px;
+    padding: 1rem;
+    margin: 1rem 0;
+}
+
+.results-container {
+    background: white;
+    border-radius: 10px;
+    padding: 1.5rem;
+    margin: 1rem 0;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+}
+
+.metric-card {
+    background: white;
+    border-radius: 10px;
+    padding: 1rem;
+    text-align: center;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+    border: 1px solid #e2e8f0;
+}
+
+.sql-code {
+    background: #1e293b;
+    color: #e2e8f0;
+    border-radius: 8px;
+    padding: 1rem;
+    font-family: 'Courier New', monospace;
+}
+</style>
+"""
+
+# (query, description, widget key) for the example buttons
+_EXAMPLE_QUERIES = [
+    (query, description, f"example_{i}")
+    for i, (query, description) in enumerate([
+        ("Show all employees in Marketing department", "List all employees working in Marketing"),
+        ("Calculate average salary by department", "What's the average salary in each department?"),
+        ("List active projects with budgets over 100000", "Show me all active projects with budgets exceeding $100,000"),
+        ("Find top 5 highest paid employees", "Who are our top 5 highest-paid employees?"),
+        ("Show departments and their total project budgets", "List all departments with their total project budgets"),
+        ("List projects starting this month", "Which projects are starting this month?"),
+        ("Show department heads and their team sizes", "List all department heads and how many employees they manage")
+    ])
+]
+
+@st.cache_resource
+def _get_db() -> DatabaseManager:
+    return DatabaseManager()
+
+@st.cache_resource
+def _get_converter(schema: str) -> TextToSQLConverter:
+    return TextToSQLConverter(schema)
+
+@st.cache_data(ttl=300)
+def _run_sql(_db_manager: DatabaseManager, sql: str, max_rows: int) -> pd.DataFrame:
+    # The leading underscore keeps the manager out of Streamlit's cache key
+    return _db_manager.execute_query(sql, max_rows=max_rows)
+
 def configure_page():
     st.set_page_config(
         layout="wide",
@@ -18,75 +132,9 @@ def configure_page():
         initial_sidebar_state="expanded"
     )
     
-    st.markdown("""
-        <style>
-        .stApp {
-            background: linear-gradient(135deg, #f5f7fa 0%, #f8f9fa 100%);
-        }
-        
-        .main-header {
-            font-size: 3rem;
-            font-weight: 700;
-            text-align: center;
-            color: #1e293b;
-            margin-bottom: 1rem;
-            padding: 1rem 0;
-        }
-        
-        .example-query-btn {
-            background-color: #ffffff;
-            border: 1px solid #e2e8f0;
-            border-radius: 8px;
-            padding: 0.75rem 1rem;
-            margin: 0.5rem 0;
-            text-align: left;
-            transition: all 0.2s ease;
-            cursor: pointer;
-            width: 100%;
-        }
-        
-        .example-query-btn:hover {
-            background-color: #f8fafc;
-            border-color: #94a3b8;
-            transform: translateY(-2px);
-        }
-        
-        .query-area {
-            background: white;
-            border: 1px solid #e2e8f0;
-            border-radius: 10px;
-            padding: 1rem;
-            margin: 1rem 0;
-        }
-        
-        .results-container {
-            background: white;
-            border-radius: 10px;
-            padding: 1.5rem;
-            margin: 1rem 0;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        }
-        
-        .metric-card {
-            background: white;
-            border-radius: 10px;
-            padding: 1rem;
-            text-align: center;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-            border: 1px solid #e2e8f0;
-        }
-        
-        .sql-code {
-            background: #1e293b;
-            color: #e2e8f0;
-            border-radius: 8px;
-            padding: 1rem;
-            font-family: 'Courier New', monospace;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-
-def execute_query(query_text: str, converter: TextToSQLConverter, db_manager: DatabaseManager):
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
+
+def execute_query(query_text: str, converter: TextToSQLConverter, db_manager: DatabaseManager, max_rows: int = PREVIEW_ROWS, show_chart: bool = False):
     try:
         with st.spinner("🪄 Converting to SQL..."):
             sql_query = converter.convert_to_sql(query_text)
@@ -95,25 +143,41 @@ def execute_query(query_text: str, converter: TextToSQLConverter, db_manager: Da
         st.code(sql_query, language="sql")
         
         with st.spinner("⚡ Executing query..."):
-            results = db_manager.execute_query(sql_query)
+            # Fetch one extra row to tell a cut-off result from one of exactly max_rows
+            results = _run_sql(db_manager, sql_query, None if max_rows is None else max_rows + 1)
+            truncated = max_rows is not None and len(results) > max_rows
+            if truncated:
+                results = results.iloc[:max_rows]
             
         st.markdown("### 📊 Results")
-        st.dataframe(
-            results.style.background_gradient(
-                cmap='Blues',
-                subset=results.select_dtypes(include=['float64', 'int64']).columns
-            ),
-            use_container_width=True
-        )
+        if truncated:
+            st.caption(
+                f"Showing the first {max_rows} rows. Tick \"Fetch all rows\" and run "
+                "the query again to load the full result."
+            )
+        numeric_cols = results.select_dtypes(include='number').columns
+        # Styler renders every cell, so only use it for small frames with
+        # something to shade
+        if len(numeric_cols) > 0 and results.size <= MAX_STYLED_CELLS:
+            st.dataframe(
+                results.style.background_gradient(
+                    cmap='Blues',
+                    subset=numeric_cols
+                ),
+                use_container_width=True
+            )
+        else:
+            st.dataframe(results, use_container_width=True)
         
-        # Create visualization
-        fig = create_visualization(results)
-        if fig:
-            st.plotly_chart(fig, use_container_width=True)
+        # Only build the figure when a chart was requested
+        if show_chart:
+            fig = create_visualization(results, numeric_cols)
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
             
         # Save to history
         if 'query_history' not in st.session_state:
-            st.session_state.query_history = []
+            st.session_state.query_history = deque(maxlen=HISTORY_LIMIT)
         st.session_state.query_history.append({
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'query': query_text,
@@ -124,7 +188,7 @@ def execute_query(query_text: str, converter: TextToSQLConverter, db_manager: Da
     except Exception as e:
         st.error(f"🚫 Error: {str(e)}")
         if 'query_history' not in st.session_state:
-            st.session_state.query_history = []
+            st.session_state.query_history = deque(maxlen=HISTORY_LIMIT)
         st.session_state.query_history.append({
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'query': query_text,
@@ -132,19 +196,33 @@ def execute_query(query_text: str, converter: TextToSQLConverter, db_manager: Da
             'success': False
         })
 
-def create_visualization(df: pd.DataFrame) -> go.Figure:
+def create_visualization(df: pd.DataFrame, numeric_cols: pd.Index) -> "go.Figure":
     if len(df) == 0:
         return None
+    
+    # Plotly is only imported once a chart is actually requested
+    import plotly.express as px
         
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
     if len(numeric_cols) > 0:
+        # Nothing worth plotting if every numeric column is constant; a single
+        # row (typical aggregate answer) still gets its bar chart
+        if len(df) > 1 and (df[numeric_cols].nunique() <= 1).all():
+            return None
+        
+        # Downsample very large frames before handing them to Plotly
+        total_points = len(df) * len(numeric_cols)
+        if total_points > MAX_CHART_POINTS:
+            step = -(-total_points // MAX_CHART_POINTS)
+            df = df.iloc[::step]
+        
         if len(df) > 10:  # Line chart for time series or large datasets
             fig = px.line(
                 df,
                 y=numeric_cols,
                 markers=True,
                 template="plotly_white",
-                title="📊 Data Visualization"
+                title="📊 Data Visualization",
+                render_mode="webgl" if len(df) > WEBGL_ROWS else "auto"
             )
         else:  # Bar chart for smaller datasets
             fig = px.bar(
@@ -176,8 +254,8 @@ def main():
     st.markdown('<h1 class="main-header">✨ SQL Magic Assistant</h1>', unsafe_allow_html=True)
     
     # Initialize components
-    db_manager = DatabaseManager()
-    converter = TextToSQLConverter(db_manager.get_schema())
+    db_manager = _get_db()
+    converter = _get_converter(db_manager.get_schema())
     
     # Dashboard layout
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -191,33 +269,26 @@ def main():
             height=100,
             help="💡 Type your question naturally - I'll convert it to SQL!"
         )
+        fetch_all = st.checkbox("Fetch all rows", key="fetch_all", help="By default only a preview of the results is loaded")
+        max_rows = None if fetch_all else PREVIEW_ROWS
+        show_chart = st.checkbox("Show chart", key="show_chart", help="Build a chart of the numeric result columns")
         
         if st.button("🚀 Generate & Execute Query", type="primary", use_container_width=True):
             if query_input:
-                execute_query(query_input, converter, db_manager)
+                execute_query(query_input, converter, db_manager, max_rows, show_chart)
             else:
                 st.warning("🤔 Please enter a question first!")
     
     with col2:
         st.markdown("### ⭐ Example Queries")
-        example_queries = [
-            ("Show all employees in Marketing department", "List all employees working in Marketing"),
-            ("Calculate average salary by department", "What's the average salary in each department?"),
-            ("List active projects with budgets over 100000", "Show me all active projects with budgets exceeding $100,000"),
-            ("Find top 5 highest paid employees", "Who are our top 5 highest-paid employees?"),
-            ("Show departments and their total project budgets", "List all departments with their total project budgets"),
-            ("List projects starting this month", "Which projects are starting this month?"),
-            ("Show department heads and their team sizes", "List all department heads and how many employees they manage")
-        ]
-        
-        for query_text, description in example_queries:
-            if st.button(f"💡 {description}", key=f"example_{hash(query_text)}", use_container_width=True):
-                execute_query(query_text, converter, db_manager)
+        for query_text, description, key in _EXAMPLE_QUERIES:
+            if st.button(f"💡 {description}", key=key, use_container_width=True):
+                execute_query(query_text, converter, db_manager, max_rows, show_chart)
     
     with col3:
         st.markdown("### 📜 Query History")
         if 'query_history' in st.session_state and st.session_state.query_history:
-            for item in reversed(st.session_state.query_history[-5:]):
+            for item in islice(reversed(st.session_state.query_history), HISTORY_DISPLAY):
                 with st.expander(f"🕒 {item['timestamp']}", expanded=False):
                     st.write("Question:", item['query'])
                     if item['success']:
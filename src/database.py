@@ -1,17 +1,39 @@
 import sqlite3
+import threading
 import pandas as pd
 import os
 
 class DatabaseManager:
+    TABLES = ('employees', 'departments', 'projects')
+    
     def __init__(self):
         self.db_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'company.db')
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._schema = None
+        
+        # Keep one connection open for the lifetime of the manager; Streamlit may
+        # touch it from different script threads, so access is serialized by a lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA synchronous=NORMAL;
+            PRAGMA cache_size=-20000;
+            PRAGMA temp_store=MEMORY;
+        """)
+        self._lock = threading.Lock()
         self.create_database()
     
     def create_database(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cursor = conn.cursor()
         
+        # Nothing to do if a previous run already created and seeded the tables
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name IN (?, ?, ?)",
+            self.TABLES
+        )
+        if cursor.fetchone()[0] == len(self.TABLES):
+            return
+        
         # Create tables with comprehensive schema
         cursor.executescript("""
             CREATE TABLE IF NOT EXISTS employees (
@@ -46,7 +68,8 @@ class DatabaseManager:
             );
         """)
         
-        # Insert comprehensive sample data
+        # Insert comprehensive sample data; the inserts share one implicit
+        # transaction that is committed below
         cursor.executemany("INSERT OR IGNORE INTO employees VALUES (?, ?, ?, ?, ?, ?, ?)", [
             (1, 'John Smith', 'Engineering', 85000, '2024-01-15', 'Senior Engineer', 'john.smith@company.com'),
             (2, 'Emma Davis', 'Marketing', 75000, '2024-02-01', 'Marketing Manager', 'emma.davis@company.com'),
@@ -68,24 +91,43 @@ class DatabaseManager:
         ])
         
         conn.commit()
-        conn.close()
     
-    def execute_query(self, query):
-        conn = sqlite3.connect(self.db_path)
-        try:
-            result = pd.read_sql_query(query, conn)
-            return result
-        finally:
-            conn.close()
+    def execute_query(self, query, max_rows=10_000, chunksize=4096):
+        # Fetch rows straight off the cursor in chunks, stopping once max_rows
+        # is reached (None fetches all), and build the frame in one go; this
+        # skips read_sql_query's per-chunk frame construction and concat
+        with self._lock:
+            cursor = self._conn.execute(query)
+            try:
+                if cursor.description is None:
+                    return pd.DataFrame()
+                columns = [d[0] for d in cursor.description]
+                
+                rows = []
+                while max_rows is None or len(rows) < max_rows:
+                    size = chunksize if max_rows is None else min(chunksize, max_rows - len(rows))
+                    batch = cursor.fetchmany(size)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+            finally:
+                cursor.close()
+        
+        return pd.DataFrame(rows, columns=columns)
     
     def get_schema(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # The schema is fixed for the lifetime of the manager, so build it once
+        if self._schema is not None:
+            return self._schema
         
-        schema = []
-        for table in ['employees', 'departments', 'projects']:
-            cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table}'")
-            schema.append(cursor.fetchone()[0] + ";")
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type='table' AND name IN (?, ?, ?)",
+                self.TABLES
+            )
+            rows = dict(cursor.fetchall())
         
-        conn.close()
-        return "\n\n".join(schema)
\ No newline at end of file
+        schema = [rows[table] + ";" for table in self.TABLES]
+        self._schema = "\n\n".join(schema)
+        return self._schema
\ No newline at end of file
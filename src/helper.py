@@ -1,18 +1,33 @@
 import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import functools
+import ahocorasick
 import re
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Any
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Patterns used on every parse, compiled once at import
+_GROUP_BY_RE = re.compile(r'by\s+(\w+)')
+_ORDER_RE = re.compile(r'(?:order|sort)(?:ed)?\s+by\s+(\w+)\s*(desc(?:ending)?|asc(?:ending)?)?')
+_LIMIT_RE = re.compile(r'(?:top|first|limit)\s+(\d+)')
+_CONDITION_TRIGGER_RE = re.compile(r'\b(?:in|with|where)\b')
+
+@functools.lru_cache(maxsize=1)
+def _get_nlp():
+    """Load the spaCy pipeline once per process.
+
+    Only tokenization and the dependency parse are used downstream, so the
+    NER, lemmatizer and attribute ruler components are disabled.
+    """
+    logger.info("Loading spaCy pipeline en_core_web_sm")
+    return spacy.load("en_core_web_sm", disable=["ner", "lemmatizer", "attribute_ruler"])
+
 class TextToSQLConverter:
     def __init__(self, db_schema: Optional[str] = None):
         logger.info("Initializing Enhanced TextToSQLConverter")
-        self.nlp = spacy.load("en_core_web_sm")
+        self.nlp = _get_nlp()
         self.db_schema = db_schema
         
         # Enhanced table relationships with clear join paths
@@ -86,11 +101,55 @@ class TextToSQLConverter:
             }
         }
 
+        # Lowercased schema lookups, built once instead of per token
+        self._tables_lc = {t.lower(): t for t in self.table_columns}
+        self._col_to_tables = defaultdict(list)
+        for table, columns in self.table_columns.items():
+            for column in columns:
+                self._col_to_tables[column.lower()].append(table)
+        
+        # Flattened phrase -> type lookups so the hot paths run a single loop
+        self._agg_phrases = {p: t.upper() for t, ps in self.patterns['aggregate'].items() for p in ps}
+        self._cond_phrases = {p: t for t, ps in self.patterns['conditions'].items() for p in ps}
+        
+        # Single-pass matcher for table and column mentions
+        self._entity_automaton = self._build_entity_automaton()
+        
+        # Memoize conversions per instance; rebuild the converter when the schema changes
+        self._convert_cached = functools.lru_cache(maxsize=256)(self._convert_to_sql_impl)
+
+    def _build_entity_automaton(self) -> ahocorasick.Automaton:
+        """Build an Aho-Corasick automaton over all table and column names."""
+        automaton = ahocorasick.Automaton()
+        entries = defaultdict(list)
+        for table_lc, table in self._tables_lc.items():
+            # Accept both "employees" and "employee" for table mentions
+            for word in {table_lc, table_lc.rstrip('s')}:
+                entries[word].append((table, None))
+        for column_lc, tables in self._col_to_tables.items():
+            # Accept both "budget" and "budgets" for column mentions, unless the
+            # plural is already a table name ("departments")
+            words = [column_lc]
+            if column_lc + 's' not in self._tables_lc:
+                words.append(column_lc + 's')
+            for word in words:
+                for table in tables:
+                    entries[word].append((table, column_lc))
+        
+        for word, targets in entries.items():
+            automaton.add_word(word, (len(word), targets))
+        automaton.make_automaton()
+        return automaton
+
     def convert_to_sql(self, text: str) -> str:
         """Convert natural language query to SQL."""
+        return self._convert_cached(text.lower().strip())
+
+    def _convert_to_sql_impl(self, text: str) -> str:
+        """Convert a normalized (lowercased, stripped) query to SQL."""
         try:
             # Parse query intent and components
-            query_components = self._parse_query(text.lower())
+            query_components = self._parse_query(text)
             
             # Build SQL query
             sql = self._build_sql_query(query_components)
@@ -103,9 +162,11 @@ class TextToSQLConverter:
             raise ValueError(f"Failed to convert text to SQL: {str(e)}")
 
     def _parse_query(self, text: str) -> Dict[str, Any]:
-        """Parse natural language query into structured components."""
-        doc = self.nlp(text)
-        
+        """Parse natural language query into structured components.
+
+        ``text`` is already lowercased by ``convert_to_sql`` and is passed
+        straight to the string-based extractors.
+        """
         components = {
             'select': {'tables': set(), 'columns': set()},
             'joins': [],
@@ -114,41 +175,69 @@ class TextToSQLConverter:
             'having': [],
             'order_by': [],
             'limit': None,
-            'aggregates': []
+            'aggregates': [],
+            'mentioned_columns': []
         }
         
         # Extract main entities (tables and columns)
-        self._extract_entities(doc, components)
+        self._extract_entities(text, components)
         
-        # Extract conditions
-        self._extract_conditions(doc, components)
+        # Extract conditions; only these need the dependency parse, so skip
+        # spaCy entirely when none of the trigger words appear
+        if _CONDITION_TRIGGER_RE.search(text):
+            doc = self.nlp(text)
+            self._extract_conditions(doc, components)
         
         # Extract aggregations and grouping
-        self._extract_aggregations(doc, components)
+        self._extract_aggregations(text, components)
         
         # Extract ordering
-        self._extract_ordering(doc, components)
+        self._extract_ordering(text, components)
         
         # Extract limits
-        self._extract_limits(doc, components)
+        self._extract_limits(text, components)
         
         return components
 
-    def _extract_entities(self, doc, components):
-        """Extract table and column references from the query."""
-        # Find table references
-        for token in doc:
-            # Check for table names
-            for table in self.table_columns.keys():
-                if table.lower() in token.text.lower() or token.text.lower() in table.lower():
-                    components['select']['tables'].add(table)
-                    
-            # Check for column references
-            for table in self.table_columns:
-                for column in self.table_columns[table]:
-                    if column.lower() in token.text.lower():
-                        components['select']['columns'].add(f"{table}.{column}")
-                        components['select']['tables'].add(table)
+    def _extract_entities(self, text: str, components):
+        """Extract table and column references from the lowercased query."""
+        table_mentions = defaultdict(list)
+        column_mentions = []
+        
+        # Scan the query once for all table and column names
+        for end_idx, (length, targets) in self._entity_automaton.iter(text):
+            start_idx = end_idx - length + 1
+            # Only accept whole-word matches
+            if start_idx > 0 and (text[start_idx - 1].isalnum() or text[start_idx - 1] == '_'):
+                continue
+            if end_idx + 1 < len(text) and (text[end_idx + 1].isalnum() or text[end_idx + 1] == '_'):
+                continue
+            
+            for table, column in targets:
+                if column is None:
+                    table_mentions[table].append((start_idx, end_idx))
+            column_targets = [(table, column) for table, column in targets if column is not None]
+            if column_targets:
+                column_mentions.append((start_idx, end_idx, column_targets))
+        
+        components['select']['tables'].update(table_mentions)
+        
+        for start_idx, end_idx, column_targets in column_mentions:
+            # A column shared by several tables resolves to the named table
+            # closest to it; with no named candidate every table is kept
+            named = [(table, column) for table, column in column_targets if table in table_mentions]
+            if len(column_targets) > 1 and named:
+                column_targets = [min(named, key=lambda target: min(
+                    start_idx - t_end if t_end < start_idx else t_start - end_idx
+                    for t_start, t_end in table_mentions[target[0]]
+                ))]
+            
+            for table, column in column_targets:
+                components['select']['tables'].add(table)
+                qualified = f"{table}.{column}"
+                if qualified not in components['select']['columns']:
+                    components['mentioned_columns'].append(qualified)
+                components['select']['columns'].add(qualified)
         
         # If no specific columns are mentioned, add all columns from mentioned tables
         if not components['select']['columns']:
@@ -156,6 +245,16 @@ class TextToSQLConverter:
                 for column in self.table_columns[table]:
                     components['select']['columns'].add(f"{table}.{column}")
 
+    def _resolve_column_tables(self, column: str, components) -> List[str]:
+        """Return the tables a GROUP BY/ORDER BY column refers to.
+
+        Tables already selected by ``_extract_entities`` win; every table with
+        the column is used only when none of them is in the query.
+        """
+        candidates = self._col_to_tables.get(column, [])
+        selected = [t for t in candidates if t in components['select']['tables']]
+        return selected or candidates
+
     def _extract_conditions(self, doc, components):
         """Extract WHERE conditions from the query."""
         for token in doc:
@@ -172,66 +271,55 @@ class TextToSQLConverter:
         phrase = ' '.join([t.text for t in token.rights])
         
         # Try to match conditions patterns
-        for op_type, patterns in self.patterns['conditions'].items():
-            for pattern in patterns:
-                if pattern in phrase:
-                    condition['operator'] = op_type
-                    parts = phrase.split(pattern)
-                    if len(parts) == 2:
-                        condition['column'] = parts[0].strip()
-                        condition['value'] = parts[1].strip()
-                        return condition
+        for pattern, op_type in self._cond_phrases.items():
+            if pattern in phrase:
+                condition['operator'] = op_type
+                parts = phrase.split(pattern)
+                if len(parts) == 2:
+                    condition['column'] = parts[0].strip()
+                    condition['value'] = parts[1].strip()
+                    return condition
         
         return None
 
-    def _extract_aggregations(self, doc, components):
+    def _extract_aggregations(self, text: str, components):
         """Extract aggregation functions and GROUP BY clauses."""
-        text = doc.text.lower()
+        # Check for aggregation functions, once per distinct function
+        functions = dict.fromkeys(f for p, f in self._agg_phrases.items() if p in text)
         
-        # Check for aggregation functions
-        for agg_type, patterns in self.patterns['aggregate'].items():
-            for pattern in patterns:
-                if pattern in text:
-                    # Find the column being aggregated
-                    for table in self.table_columns:
-                        for column in self.table_columns[table]:
-                            if column.lower() in text:
-                                components['aggregates'].append({
-                                    'function': agg_type.upper(),
-                                    'column': f"{table}.{column}"
-                                })
+        # Aggregate the columns _extract_entities found in the query
+        for function in functions:
+            for column in components['mentioned_columns']:
+                components['aggregates'].append({
+                    'function': function,
+                    'column': column
+                })
         
         # Check for GROUP BY
-        group_matches = re.findall(r'by\s+(\w+)', text)
+        group_matches = _GROUP_BY_RE.findall(text)
         for match in group_matches:
-            for table in self.table_columns:
-                if match in self.table_columns[table]:
-                    components['group_by'].append(f"{table}.{match}")
+            for table in self._resolve_column_tables(match, components):
+                components['group_by'].append(f"{table}.{match}")
 
-    def _extract_ordering(self, doc, components):
+    def _extract_ordering(self, text: str, components):
         """Extract ORDER BY clauses."""
-        text = doc.text.lower()
-        
         # Check for ordering indicators
-        order_match = re.search(r'(?:order|sort)(?:ed)?\s+by\s+(\w+)\s*(desc(?:ending)?|asc(?:ending)?)?', text)
+        order_match = _ORDER_RE.search(text)
         if order_match:
             column = order_match.group(1)
             direction = 'DESC' if order_match.group(2) and 'desc' in order_match.group(2) else 'ASC'
             
             # Find the table for this column
-            for table in self.table_columns:
-                if column in self.table_columns[table]:
-                    components['order_by'].append({
-                        'column': f"{table}.{column}",
-                        'direction': direction
-                    })
+            for table in self._resolve_column_tables(column, components):
+                components['order_by'].append({
+                    'column': f"{table}.{column}",
+                    'direction': direction
+                })
 
-    def _extract_limits(self, doc, components):
+    def _extract_limits(self, text: str, components):
         """Extract LIMIT clause."""
-        text = doc.text.lower()
-        
         # Look for numeric limits
-        limit_match = re.search(r'(?:top|first|limit)\s+(\d+)', text)
+        limit_match = _LIMIT_RE.search(text)
         if limit_match:
             components['limit'] = int(limit_match.group(1))
 
@@ -0,0 +1,60 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("en_core_web_sm")
+pytest.importorskip("ahocorasick")
+
+from src.helper import TextToSQLConverter
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'company.db')
+
+
+@pytest.fixture(scope="module")
+def converter():
+    return TextToSQLConverter()
+
+
+@pytest.fixture
+def conn(tmp_path):
+    # Run the generated SQL against a copy so the tracked database is untouched
+    db_copy = tmp_path / "company.db"
+    shutil.copy(DB_PATH, db_copy)
+    conn = sqlite3.connect(db_copy)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("query", [
+    "projects sorted by budget",
+    "list employees ordered by name",
+    "average budget of projects",
+    "Show departments and their total project budgets",
+])
+def test_generated_sql_executes(converter, conn, query):
+    conn.execute(converter.convert_to_sql(query)).fetchall()
+
+
+def test_shared_column_resolves_to_named_table(converter):
+    sql = converter.convert_to_sql("average budget of projects")
+    assert "AVG(projects.budget)" in sql
+    assert "departments" not in sql
+
+
+def test_plural_column_with_nearest_table(converter):
+    sql = converter.convert_to_sql("Show departments and their total project budgets")
+    assert sql.count("SUM(") == 1
+    assert "SUM(projects.budget)" in sql
+
+
+def test_group_and_order_by_use_selected_tables(converter):
+    sql = converter.convert_to_sql("projects sorted by budget")
+    assert "departments.budget" not in sql
+    assert "ORDER BY projects.budget ASC" in sql
+
+    sql = converter.convert_to_sql("list employees ordered by name")
+    assert "departments.name" not in sql
+    assert "ORDER BY employees.name ASC" in sql